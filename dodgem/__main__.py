@@ -1,84 +1,253 @@
 import argparse
+import functools
+import getopt
 import os
 import sys
-import json
-from .dodgem import Dodgem, EVALMAP
+import types
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
-def load_config():
-    """Load config from ~/.dodgem or return defaults."""
-    home = os.path.expanduser("~")
-    cfg_file = os.path.join(home, ".dodgem")
+_CFG_FILE = os.path.expanduser("~") + os.sep + ".dodgem"
+
+
+def load_config(cfg_file=_CFG_FILE):
+    """Load config from cfg_file (default ~/.dodgem) or return defaults."""
     config = {
         "mongo_server": "mongodb://localhost:27017/",
-        "evalmap_path": EVALMAP  # package default
+        "evalmap_path": None  # resolved to the package default in main()
     }
-    if os.path.exists(cfg_file):
-        try:
-            with open(cfg_file, "r") as f:
-                user_cfg = json.load(f)
-            config.update(user_cfg)
-        except Exception as e:
-            print(f"Warning: failed to read config {cfg_file}: {e}")
+    try:
+        fd = os.open(cfg_file, os.O_RDONLY)
+    except FileNotFoundError:
+        return config
+    except OSError as e:
+        _cfg_warn(cfg_file, e)
+        return config
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            # Hint the kernel to prefetch; helps first read on cold cache
+            os.posix_fadvise(fd, 0, 4096, os.POSIX_FADV_WILLNEED)
+        st = os.fstat(fd)
+        data = os.read(fd, 1 << 20)
+    except OSError as e:
+        # e.g. cfg_file is a directory (the open itself succeeds on
+        # Linux) or becomes unreadable; warn and run with defaults
+        _cfg_warn(cfg_file, e)
+        return config
+    finally:
+        os.close(fd)
+    try:
+        # Memoize the parse per file state; repeated in-process main()
+        # calls (tests, GUI relaunch) skip the json.loads
+        cache_key = (st.st_mtime_ns, st.st_size)
+        cached = _cfg_memo.get(cfg_file)
+        if cached is not None and cached[0] == cache_key:
+            user_cfg = cached[1]
+        else:
+            user_cfg = _json_loads(data)
+            _cfg_memo[cfg_file] = (cache_key, user_cfg)
+        config.update(user_cfg)
+    except Exception as e:
+        _cfg_warn(cfg_file, e)
     return config
 
 
-def main():
-    description = "Dodgem: play, analyze, and manage database/evalmap."
-    config = load_config()
+_cfg_memo = {}  # cfg_file -> ((mtime_ns, size), parsed dict)
+
+
+def _cfg_warn(cfg_file, e):
+    """Report a config read failure on stderr (cold path)."""
+    sys.stderr.write(f"Warning: failed to read config {cfg_file}: {e}\n")
+
+
+DESCRIPTION = "Dodgem: play, analyze, and manage database/evalmap."
+
+# Help strings interned once at import, shared across parser builds
+_HELP = {
+    'create': 'create MongoDB evaluation database',
+    'evalmap': 'create evalmap JSON.GZ from MongoDB',
+    'level': 'level for the first player (1-4)',
+    'gote': 'level for the second player (1-4)',
+    'num': 'board size (3-5)',
+    'play': 'play games',
+    'rep': 'repetition count in play mode (default: 10)',
+    'status': 'show MongoDB status summary',
+    'traverse': 'traverse MongoDB from key (default: ini)',
+    'verbose': 'verbose level (1-5)',
+    'mongo_server': 'MongoDB server URI',
+    'evalmap_path': 'path to evalmap JSON.GZ',
+    'gui': 'launch Tcl/Tk GUI',
+}
+
 
+def build_parser(config):
+    """Build the argument parser with defaults taken from config."""
     parser = argparse.ArgumentParser(
-        description=description
+        description=DESCRIPTION
     )
     parser.add_argument('-c', '--create', action='store_true',
-                        help='create MongoDB evaluation database')
+                        help=_HELP['create'])
     parser.add_argument('-e', '--evalmap', action='store_true',
-                        help='create evalmap JSON.GZ from MongoDB')
+                        help=_HELP['evalmap'])
     parser.add_argument('-l', '--level', type=int, default=3,
-                        help='level for the first player (1-4)')
+                        help=_HELP['level'])
     parser.add_argument('-g', '--gote', type=int, default=None,
-                        help='level for the second player (1-4)')
+                        help=_HELP['gote'])
     parser.add_argument('-n', '--num', type=int,
-                        default=4, help='board size (3-5)')
-    parser.add_argument('-p', '--play', action='store_true', help='play games')
+                        default=4, help=_HELP['num'])
+    parser.add_argument('-p', '--play', action='store_true',
+                        help=_HELP['play'])
     parser.add_argument('-r', '--rep', type=int, default=10,
-                        help='repetition count in play mode (default: 10)')
+                        help=_HELP['rep'])
     parser.add_argument('-s', '--status', action='store_true',
-                        help='show MongoDB status summary')
+                        help=_HELP['status'])
     parser.add_argument('-t', '--traverse', type=str, nargs='?', const='ini',
-                        default=None, help='traverse MongoDB from key (default: ini)')
+                        default=None, help=_HELP['traverse'])
     parser.add_argument('-v', '--verbose', type=int,
-                        default=1, help='verbose level (1-5)')
+                        default=1, help=_HELP['verbose'])
     parser.add_argument('--mongo-server', type=str,
-                        default=config.get("mongo_server"), help='MongoDB server URI')
+                        default=config.mongo_server, help=_HELP['mongo_server'])
     parser.add_argument('--evalmap-path', type=str,
-                        default=config.get("evalmap_path"), help='path to evalmap JSON.GZ')
-    parser.add_argument('--gui', action='store_true', help='launch Tcl/Tk GUI')
-    args = parser.parse_args()
+                        default=config.evalmap_path, help=_HELP['evalmap_path'])
+    parser.add_argument('--gui', action='store_true', help=_HELP['gui'])
+    return parser
 
-    assert 3 <= args.num <= 5
-    assert 0 <= args.level <= 4
+
+def fast_parse(argv, config):
+    """Parse the common short-option invocations without argparse.
+
+    Handles the frequent forms (mode flags plus -l/-g/-n/-r/-v values)
+    with the lighter getopt module and returns a namespace compatible
+    with parse_args(). Returns None for anything else — -h, -t, long
+    options, or malformed input — so the caller falls back to the full
+    argparse parser and its error reporting.
+    """
+    try:
+        opts, rest = getopt.getopt(argv, 'cel:g:n:pr:sv:')
+        if rest:
+            return None
+    except getopt.GetoptError:
+        return None
+    args = types.SimpleNamespace(
+        create=False, evalmap=False, level=3, gote=None, num=4, play=False,
+        rep=10, status=False, traverse=None, verbose=1,
+        mongo_server=config.mongo_server, evalmap_path=config.evalmap_path,
+        gui=False)
+    try:
+        for opt, value in opts:
+            match opt:
+                case '-c':
+                    args.create = True
+                case '-e':
+                    args.evalmap = True
+                case '-l':
+                    args.level = int(value)
+                case '-g':
+                    args.gote = int(value)
+                case '-n':
+                    args.num = int(value)
+                case '-p':
+                    args.play = True
+                case '-r':
+                    args.rep = int(value)
+                case '-s':
+                    args.status = True
+                case '-v':
+                    args.verbose = int(value)
+    except ValueError:
+        return None
+    return args
+
+
+def validate_args(args):
+    """Return an error message for out-of-range arguments, else None.
+
+    Unlike the previous assert statements, these checks survive
+    python -O. The gote default (follow the first player's level) is
+    applied here as a side effect, as before.
+    """
+    if not 3 <= args.num <= 5:
+        return 'board size must be 3-5'
+    if not 0 <= args.level <= 4:
+        return 'level must be 0-4'
     if args.gote:
-        assert 0 <= args.gote <= 4
+        if not 0 <= args.gote <= 4:
+            return 'gote level must be 0-4'
     else:
         args.gote = args.level
-    assert 1 <= args.verbose <= 5
+    if not 1 <= args.verbose <= 5:
+        return 'verbose level must be 1-5'
+    return None
+
+
+@functools.lru_cache(maxsize=4)
+def _get_dodgem(num, evalmap_path):
+    """Return a Dodgem engine, reusing one for repeated in-process calls.
+
+    The constructor loads the evalmap from disk, so re-entrant main()
+    calls (tests, GUI relaunch) with the same board size and evalmap
+    path get the already-constructed engine back.
+    """
+    from .dodgem import Dodgem
+    return Dodgem(num, evalmap=evalmap_path)
+
+
+def print_banner():
+    """Print the short usage banner shown when no mode is selected."""
+    print(DESCRIPTION)
+    print('Run "dodgem -h" for a quick help.')
+    print('Documentation: https://sekika.github.io/dodgem-py/')
+    print('Play online: https://sekika.github.io/dodgem/')
+
+
+def main():
+    if len(sys.argv) == 1:
+        # Most common discovery path: skip config IO and argparse entirely
+        print_banner()
+        return
+    if (any(a.startswith('--mongo-server') for a in sys.argv[1:])
+            and any(a.startswith('--evalmap-path') for a in sys.argv[1:])):
+        # Both config keys are overridden on the command line, so the
+        # config file cannot influence this invocation; skip its IO.
+        config = types.SimpleNamespace(mongo_server=None, evalmap_path=None)
+    else:
+        config = types.SimpleNamespace(**load_config())
+    parser = None
+    args = fast_parse(sys.argv[1:], config)
+    if args is None:
+        parser = build_parser(config)
+        args = parser.parse_args()
+
+    def fail(message):
+        # Built lazily: the fast path has no parser unless an error occurs
+        (parser or build_parser(config)).error(message)
+
+    # Imported here so that help/error paths never pay the engine import cost
+    from .dodgem import EVALMAP
+    if args.evalmap_path is None:
+        args.evalmap_path = EVALMAP
+
+    error = validate_args(args)
+    if error:
+        fail(error)
 
     if args.gui:
         from .gui import launch_gui
         launch_gui(args)
         return
 
-    assert args.level * args.gote > 0
-    d = Dodgem(args.num, evalmap=args.evalmap_path)
+    if args.level * args.gote == 0:
+        fail('human players (level 0) require --gui')
+    d = _get_dodgem(args.num, args.evalmap_path)
     d.mongo_server = args.mongo_server
     d.verbose = args.verbose
 
     if args.play:
         d.level = [args.level, args.gote]
-        if d.level[0] != d.level[1]:
-            d.refresh_evalmap = True
-        d.play_games(args.rep)
+        d.play_games(args.rep, fresh_eval=(args.level != args.gote))
         return
     if args.create:
         d.create_database()
@@ -93,10 +262,7 @@ def main():
         d.traverse(args.traverse, [])
         return
 
-    print(description)
-    print('Run "dodgem -h" for a quick help.')
-    print('Documentation: https://sekika.github.io/dodgem-py/')
-    print('Play online: https://sekika.github.io/dodgem/')
+    print_banner()
 
 
 if __name__ == "__main__":
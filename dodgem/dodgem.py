@@ -1,19 +1,42 @@
-import copy
+from collections import Counter, OrderedDict
 import csv
 from datetime import datetime
-import gzip
+try:
+    # Drop-in gzip replacement with a much faster inflate, if installed
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
 import json
-from pymongo import MongoClient, errors
 import random
 import os
 import sys
+import time
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
 
 EVALMAP = os.path.join(os.path.dirname(__file__), "dodgem_eval.json.gz")
 MAX_DEPTH = [20, 30, 50]
+# Transposition-table entry flags: exact value, lower bound (fail-high),
+# upper bound (fail-low). Entries loaded from the evalmap file have no
+# flag field and are treated as exact.
+EXACT = 0
+LOWER = 1
+UPPER = 2
 # min_depth, min_remain, max_side
 EVAL3 = (10, 7, 5)  # 803 / 1963 positions
 EVAL4 = (15, 12, 10)  # 113,065 / 393,900 positions
 EVAL5 = (30, 15, 2)  # 879,830 / 164,308,067 positions
+# 3x3 positions rewritten to draws to break repetition cycles; see
+# Dodgem.resolve_draw()
+_FORCE_DRAW_3X3 = ('[[3,8],[4,6],1]', '[[2,3],[4,6],1]', '[[2,3],[4,8],1]')
+
+
+def _timestamp():
+    """Return the current time formatted for database-build progress lines."""
+    return datetime.now().strftime("%m-%d %H:%M:%S")
 
 
 class Dodgem():
@@ -49,8 +72,21 @@ class Dodgem():
         self.warning_issued = []
         self.server_timeout_ms = 3000
         self.client = None
+        self._mongo_cache = {}
+        self.parallel = False  # Opt-in multiprocess root search
+        self._pool = None
+        self._pool_key = None
+        self._pending_ops = []  # Queued bulk upserts for database builds
+        self._nd_decoded = {}  # not_determined key -> decoded (a, b, turn)
+        self._db_pool = None
+        self._db_pool_key = None
+        self._tt = OrderedDict()  # evaluate_simple cache: key -> (value, depth)
+        self._mg = OrderedDict()  # movegen cache: key -> [(child_key, child)]
         self.verbose = 1
         self.chars = '▷▲'
+        self._adv_n = 0  # Board size the leaf tables were built for
+        self._move_n = 0  # Board size the move tables were built for
+        self._evalmap_cache = {}
         self.evalmap_path = evalmap
         self.load_evalmap()
         self.start()
@@ -83,13 +119,13 @@ class Dodgem():
             case 1:
                 self.use_mongo = False
                 self.eval_map = {}
-                self.depth = random.randint(1, 7)
+                self.depth = 1 + moves % 7
             case 2:
                 self.use_mongo = False
                 match self.n:
                     case 3:
                         self.eval_map = {}
-                        self.depth = random.randint(6, 10)
+                        self.depth = 6 + moves % 5
                     case 4:
                         if moves < 8:
                             self.depth = 1
@@ -98,7 +134,7 @@ class Dodgem():
                             return
                         self.eval_map = {}
                         if remain > 12:
-                            self.depth = random.randint(6, 11)
+                            self.depth = 6 + moves % 6
                             return
                         self.depth = 30
                     case 5:
@@ -122,7 +158,7 @@ class Dodgem():
                         if remain < 15:
                             self.depth = 40
                         else:
-                            self.depth = random.randint(12, 18)
+                            self.depth = 12 + moves % 7
                     case 5:
                         if moves < 3:
                             self.depth = 1
@@ -138,7 +174,7 @@ class Dodgem():
 
     # Playing games
 
-    def play_games(self, repetition):
+    def play_games(self, repetition, fresh_eval=None):
         """Play multiple games in a row and return the aggregate results.
 
         Starts/plays 'repetition' games back-to-back, optionally opening
@@ -147,6 +183,10 @@ class Dodgem():
 
         Args:
             repetition (int): Number of games to play.
+            fresh_eval (bool, optional): When given, sets refresh_evalmap,
+                which controls whether the evalmap is reloaded between
+                moves (needed when the two sides play at different
+                levels). Defaults to None, keeping the current setting.
 
         Returns:
             tuple[int, int, int]: (wins_by_first, wins_by_second, draws)
@@ -154,6 +194,8 @@ class Dodgem():
         Raises:
             SystemExit: If MongoDB is required and cannot be opened.
         """
+        if fresh_eval is not None:
+            self.refresh_evalmap = fresh_eval
         if max(self.level) == 4 or self.verbose > 3:
             self.open_mongodb()
         if self.verbose > 0:
@@ -286,8 +328,8 @@ class Dodgem():
         Returns:
             str: A move string such as "5-6" or "3-X".
         """
-        prev = json.loads(moves[-2])
-        current = json.loads(moves[-1])
+        prev = _loads(moves[-2])
+        current = _loads(moves[-1])
         if prev[0] == current[0]:
             prev_pos = prev[1]
             current_pos = current[1]
@@ -330,20 +372,27 @@ class Dodgem():
         min_eval = self.eval_win + 2
         p = []
 
-        # Evaluate all the possible moves
+        # Fetch the evaluations of all candidates with one query instead
+        # of one round trip per candidate
+        if self.use_mongo or self.verbose > 3:
+            self._mongo_cache = self.find_values(
+                [self.make_key(child, 1 - self.turn) for child in pos])
+
+        evals = self.evaluate_candidates(pos)
+
         for i in range(len(pos)):
-            e = self.evaluate(pos[i], 1 - self.turn, self.depth)
-            key = self.make_key(pos[i], 1 - self.turn)
+            e = evals[i]
             if self.depth == 1 and abs(e) < self.eval_win:
                 e = self.remain(pos[i])
             if self.verbose > 3:
-                result = self.collection.find_one({"_id": key})
-                if result and "value" in result:
-                    eval = f'{result["value"]}'
+                key = self.make_key(pos[i], 1 - self.turn)
+                if key in self._mongo_cache:
+                    eval = f'{self._mongo_cache[key]}'
                 else:
                     eval = 'none'
-                if key in self.eval_map:
-                    evalmap = self.eval_map[key][0]
+                ikey = self.pack_key(pos[i], 1 - self.turn)
+                if ikey in self.eval_map:
+                    evalmap = self.eval_map[ikey][0]
                 else:
                     evalmap = 'none'
                 print(
@@ -355,14 +404,15 @@ class Dodgem():
                 p.append(pos[i])
 
         # Select move that is not in the history. If not available, judge it as draw.
-        p_diff = [pos for pos in p if self.make_key(
-            pos, self.turn) not in self.move_history]
+        history_count = self.history_count
+        p_diff = [pos for pos in p if self.pack_key(
+            pos, self.turn) not in history_count]
 
         if len(p_diff) < len(pos):
             if len(p_diff) == 0:
                 count = {}
                 for pos in p:
-                    c = self.move_history.count(self.make_key(pos, self.turn))
+                    c = history_count[self.pack_key(pos, self.turn)]
                     if c not in count:
                         count[c] = []
                     count[c].append(pos)
@@ -387,87 +437,382 @@ class Dodgem():
             print(f'p = {p}\np_diff = {p_diff}')
 
         self.pieces = random.choice(p)
-        self.move_history.append(self.make_key(self.pieces, self.turn))
+        self.record_move(self.pieces, self.turn)
 
         if self.is_finished():
             self.finished = True
 
         self.turn = 1 - self.turn
 
-    def evaluate(self, pieces, turn, depth):
-        """Evaluate a position via depth-limited negamax with memoization and DB.
+    def evaluate_candidates(self, pos):
+        """Evaluate all root candidates and return their values.
+
+        Serial mode runs iterative deepening: each depth reuses the
+        transposition table filled by the previous one and visits the
+        candidates in the previous depth's best-first order, and a
+        forced win found at a shallow depth ends the search early.
+        When self.parallel is set and MongoDB is not in use, the
+        candidates are instead searched at full depth concurrently in
+        worker processes; any pool failure falls back to the serial
+        search.
+
+        Args:
+            pos (list): Candidate successor positions for self.turn.
+
+        Returns:
+            list[int]: Evaluation of each candidate, in negamax
+                convention from the opponent's perspective.
+        """
+        if self.parallel and not self.use_mongo and self.depth > 1:
+            try:
+                return self._evaluate_parallel(pos)
+            except Exception as e:
+                if self.verbose > 0:
+                    print(f'Parallel search failed ({e}); searching serially')
+        evals = [0] * len(pos)
+        order = list(range(len(pos)))
+        for d in range(1, self.depth + 1):
+            win_found = False
+            for i in order:
+                e = self.evaluate(pos[i], 1 - self.turn, d)
+                evals[i] = e
+                if e <= -self.eval_win:
+                    # A forced win is available; searching the remaining
+                    # candidates cannot produce a better move
+                    win_found = True
+                    break
+            if win_found:
+                break
+            order.sort(key=evals.__getitem__)
+        return evals
+
+    def _evaluate_parallel(self, pos):
+        """Search the root candidates concurrently in worker processes.
+
+        The root fan-out is embarrassingly parallel, and worker processes
+        sidestep the GIL. Each worker keeps its own engine and
+        transposition table for the lifetime of the pool, so later moves
+        of the same game reuse earlier search effort within each worker.
+
+        Args:
+            pos (list): Candidate successor positions for self.turn.
+
+        Returns:
+            list[int]: Evaluation of each candidate.
+        """
+        pool = self._search_pool()
+        jobs = [(p, 1 - self.turn, self.depth) for p in pos]
+        return list(pool.map(_search_root, jobs))
+
+    def _search_pool(self):
+        """Return the worker pool, rebuilding it when its setup is stale.
+
+        The pool is keyed on board size, evalmap path, and whether the
+        current level uses the evalmap, because the workers bake those
+        into their engines at startup.
+
+        Returns:
+            concurrent.futures.ProcessPoolExecutor: The active pool.
+        """
+        key = (self.n, self.evalmap_path, bool(self.eval_map))
+        if self._pool_key != key:
+            if self._pool is not None:
+                self._pool.shutdown()
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, 8),
+                initializer=_search_init,
+                initargs=key)
+            self._pool_key = key
+        return self._pool
+
+    def _evaluate_bucket_parallel(self, keys, search_depth):
+        """Evaluate a database-build bucket across worker processes.
+
+        Each key is independent, so the bucket is sharded over a pool
+        whose workers hold their own engine and MongoDB client. The
+        caller aggregates the returned tuples into bulk writes and the
+        not_determined set.
+
+        Args:
+            keys (list[str]): Canonical position keys without values.
+            search_depth (int): Depth for the workers' evaluate_simple.
+
+        Returns:
+            list[tuple[str, int, int]]: (key, evaluation, remain) per key.
+        """
+        pool = self._bucket_pool()
+        workers = min(os.cpu_count() or 1, 8)
+        chunk = max(1000, len(keys) // (workers * 4))
+        jobs = [(keys[i:i + chunk], search_depth)
+                for i in range(0, len(keys), chunk)]
+        results = []
+        for part in pool.map(_bucket_eval, jobs):
+            results.extend(part)
+        return results
+
+    def _bucket_pool(self):
+        """Return the database-build worker pool, rebuilding when stale.
+
+        Keyed on board size, evalmap path, and MongoDB server, which the
+        workers bake into their engines at startup.
+
+        Returns:
+            concurrent.futures.ProcessPoolExecutor: The active pool.
+        """
+        key = (self.n, self.evalmap_path, self.mongo_server)
+        if self._db_pool_key != key:
+            if self._db_pool is not None:
+                self._db_pool.shutdown()
+            from concurrent.futures import ProcessPoolExecutor
+            self._db_pool = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, 8),
+                initializer=_bucket_init,
+                initargs=key)
+            self._db_pool_key = key
+        return self._db_pool
+
+    def evaluate(self, pieces, turn, depth, alpha=None, beta=None):
+        """Evaluate a position via depth-limited alpha-beta with memoization and DB.
 
         Uses:
         - Terminal checks for empty side or no legal moves.
-        - Depth-limited negamax; at leaf depth, uses a heuristic based on remain().
-        - In-memory eval_map as a transposition table.
+        - Depth-limited negamax with an alpha-beta window; at leaf depth,
+          a heuristic based on remain() is used.
+        - In-memory eval_map as a transposition table. Entries are
+          [value, depth, flag]; flag is EXACT, LOWER or UPPER, and
+          two-element entries from the evalmap file count as EXACT.
         - Optional MongoDB lookups when enabled.
 
         Args:
             pieces (list[list[int]]): Position as [list_of_first, list_of_second].
             turn (int): Side to move, 0 for First, 1 for Second.
             depth (int): Remaining search depth. At 0, heuristic evaluation is used.
+            alpha (int, optional): Lower bound of the search window.
+                Defaults to the full window.
+            beta (int, optional): Upper bound of the search window.
+                Defaults to the full window.
 
         Returns:
             int: Evaluation in negamax convention from the current side's perspective.
                  Values ≥ +eval_win indicate a forced win; ≤ -eval_win indicate a forced loss;
-                 0 can indicate forced draw.
+                 0 can indicate forced draw. When called with a narrowed
+                 window, the result may be a bound in standard
+                 alpha-beta fashion; top-level callers use the full
+                 window and get exact values.
 
         Raises:
             None
         """
-        key = self.make_key(pieces, turn)
-        if self.use_mongo:
-            result = self.collection.find_one({"_id": key})
-            if result and 'value' in result:
-                return result["value"]
-
-        if key in self.eval_map and self.eval_map[key][1] >= depth:
-            return self.eval_map[key][0]
-
-        if len(pieces[turn]) == 0:
-            return self.eval_win
-        if len(pieces[1 - turn]) == 0:
-            return -self.eval_win
+        # Hoist the attributes touched on every node into locals; the
+        # LOAD_FAST they compile to is much cheaper than repeated self
+        # dictionary lookups in this, the hottest, function
+        eval_win = self.eval_win
+        eval_map = self.eval_map
+        if alpha is None:
+            alpha = -eval_win - 2
+        if beta is None:
+            beta = eval_win + 2
+        if not self.use_mongo:
+            # The in-memory search runs entirely on bitboards; pieces
+            # are converted once here and never rebuilt as lists
+            bb0, bb1 = self.to_bits(pieces)
+            return self.evaluate_bits(bb0, bb1, turn, depth, alpha, beta)
+
+        # MongoDB mode: stay on the list-based search so that every
+        # recursion level keeps consulting the database as before
+        mkey = self.make_key(pieces, turn)
+        if mkey in self._mongo_cache:
+            return self._mongo_cache[mkey]
+        result = self.collection.find_one(
+            {"_id": mkey}, {"_id": 0, "value": 1})
+        if result and 'value' in result:
+            return result["value"]
+
+        key = self.pack_key(pieces, turn)
+        entry = eval_map.get(key)
+        if entry is not None and entry[1] >= depth:
+            value = entry[0]
+            flag = entry[2] if len(entry) > 2 else EXACT
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        if not pieces[turn]:
+            return eval_win
+        if not pieces[1 - turn]:
+            return -eval_win
         pos = self.next_positions(pieces, turn)
-        if len(pos) == 0:
-            return self.eval_win + 1
+        if not pos:
+            return eval_win + 1
 
         if depth < 1:
+            first_adv, second_adv, not_right = self._leaf_tables()
+            n = self.n
+            first, second = pieces
             remain = 0
-            for piece in pieces[1]:
-                remain -= 1 + piece // self.n
-                if (piece - self.n) in pieces[0]:
+            for piece in second:
+                remain -= second_adv[piece]
+                if (piece - n) in first:
                     remain -= 1
-            for piece in pieces[0]:
-                remain += self.n - (piece % self.n)
-                if (piece % self.n < self.n - 1) and ((piece + 1) in pieces[1]):
+            for piece in first:
+                remain += first_adv[piece]
+                if not_right[piece] and ((piece + 1) in second):
                     remain += 1
             return 1 - 2 * remain if turn == 0 else 1 + 2 * remain
 
-        min_eval = self.eval_win + 1
+        alpha_org = alpha
+        best = -eval_win - 1
+        evaluate = self.evaluate
+        opponent = 1 - turn
+        child_depth = depth - 1
         for p in pos:
-            key = self.make_key(p, 1 - turn)
+            e = evaluate(p, opponent, child_depth, -beta, -alpha)
+            if -e > best:
+                best = -e
+            if best >= eval_win:
+                break  # Forced win; remaining moves cannot matter
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= alpha_org:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        eval_map[key] = [best, depth, flag]
+        return best
+
+    def evaluate_bits(self, bb0, bb1, turn, depth, alpha, beta):
+        """Evaluate a bitboard position via depth-limited alpha-beta.
+
+        The bitboard counterpart of evaluate for the in-memory search:
+        positions are (first_bits, second_bits) integer pairs, children
+        come from next_bits, and the leaf heuristic walks set bits, so
+        no piece lists are allocated anywhere in the recursion. The
+        transposition-table key is identical to pack_key of the same
+        position, keeping entries interchangeable with the evalmap.
+
+        Args:
+            bb0 (int): Bitset of the First player's pieces.
+            bb1 (int): Bitset of the Second player's pieces.
+            turn (int): Side to move, 0 for First, 1 for Second.
+            depth (int): Remaining search depth. At 0, heuristic evaluation is used.
+            alpha (int): Lower bound of the search window.
+            beta (int): Upper bound of the search window.
 
-            if key in self.eval_map and self.eval_map[key][1] >= depth - 1:
-                e = self.eval_map[key][0]
+        Returns:
+            int: Evaluation in negamax convention from the current side's
+                perspective, as in evaluate.
+        """
+        eval_win = self.eval_win
+        eval_map = self.eval_map
+        key = (bb0 << 26) | (bb1 << 1) | turn
+        entry = eval_map.get(key)
+        if entry is not None and entry[1] >= depth:
+            value = entry[0]
+            flag = entry[2] if len(entry) > 2 else EXACT
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
             else:
-                e = self.evaluate(p, 1 - turn, depth - 1)
-                self.eval_map[key] = [e, depth - 1]
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        if not (bb1 if turn else bb0):
+            return eval_win
+        if not (bb0 if turn else bb1):
+            return -eval_win
+        pos = self.next_bits(bb0, bb1, turn)
+        if not pos:
+            return eval_win + 1
+
+        if depth < 1:
+            first_adv, second_adv, not_right = self._leaf_tables()
+            n = self.n
+            remain = 0
+            bits = bb1
+            while bits:
+                lsb = bits & -bits
+                bits ^= lsb
+                sq = lsb.bit_length() - 1
+                remain -= second_adv[sq]
+                if sq >= n and (bb0 >> (sq - n)) & 1:
+                    remain -= 1
+            bits = bb0
+            while bits:
+                lsb = bits & -bits
+                bits ^= lsb
+                sq = lsb.bit_length() - 1
+                remain += first_adv[sq]
+                if not_right[sq] and (bb1 >> (sq + 1)) & 1:
+                    remain += 1
+            return 1 - 2 * remain if turn == 0 else 1 + 2 * remain
+
+        alpha_org = alpha
+        best = -eval_win - 1
+        evaluate_bits = self.evaluate_bits
+        opponent = 1 - turn
+        child_depth = depth - 1
+        for c0, c1 in pos:
+            e = evaluate_bits(c0, c1, opponent, child_depth, -beta, -alpha)
+            if -e > best:
+                best = -e
+            if best >= eval_win:
+                break  # Forced win; remaining moves cannot matter
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= alpha_org:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        eval_map[key] = [best, depth, flag]
+        return best
+
+    def _leaf_tables(self):
+        """Return per-square tables used by the leaf evaluation.
 
-            if e <= -self.eval_win:
-                return -e
-            min_eval = min(min_eval, e)
+        The tables give each square's contribution to the remain-based
+        heuristic (column distance to exit for First, row distance for
+        Second) plus a not-in-rightmost-column flag, replacing per-piece
+        division and modulo in the hottest loop. They are rebuilt lazily
+        when the board size changes.
 
-        return -min_eval
+        Returns:
+            tuple[tuple, tuple, tuple]: (first_adv, second_adv, not_right),
+                each indexed by square.
+        """
+        if self._adv_n != self.n:
+            n = self.n
+            self._first_adv = tuple(n - i % n for i in range(n * n))
+            self._second_adv = tuple(1 + i // n for i in range(n * n))
+            self._not_right = tuple(i % n < n - 1 for i in range(n * n))
+            self._adv_n = n
+        return self._first_adv, self._second_adv, self._not_right
 
     # Evalmap
 
     def load_evalmap(self):
         """Load the evalmap from a gzipped JSON file and select the current board size.
 
-        Loads the entire evalmap file, then assigns the dictionary for the
-        current self.n to self.eval_map.
+        Loads the entire evalmap file, then converts the canonical JSON
+        string keys of the dictionary for the current self.n into packed
+        integer keys (see pack_key) and assigns it to self.eval_map.
 
         Args:
             None
@@ -479,8 +824,28 @@ class Dodgem():
             OSError: If the file cannot be opened/read.
             KeyError: If the evalmap lacks an entry for self.n.
         """
-        with gzip.open(self.evalmap_path, 'rt', encoding='utf-8') as f:
-            self.eval_map = json.load(f)[str(self.n)]
+        # set_level reloads the evalmap between moves; cache the parsed
+        # file per (path, n) and only re-read when it changed on disk.
+        # Callers get a copy so that search entries written into
+        # self.eval_map never leak into the pristine cached map.
+        mtime = os.stat(self.evalmap_path).st_mtime_ns
+        cache_key = (self.evalmap_path, self.n)
+        cached = self._evalmap_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime:
+            self.eval_map = dict(cached[1])
+            return
+        # Binary read + bytes parse skips the incremental text decoding
+        # of 'rt' mode; the subtrees for other board sizes are dropped
+        # as soon as the parse returns
+        with gzip.open(self.evalmap_path, 'rb') as f:
+            data = json.loads(f.read())[str(self.n)]
+        pack_key = self.pack_key
+        eval_map = {
+            pack_key(pos, pos[2]): entry
+            for pos, entry in ((_loads(key), entry)
+                               for key, entry in data.items())}
+        self._evalmap_cache[cache_key] = (mtime, eval_map)
+        self.eval_map = dict(eval_map)
 
     def create_evalmap(self):
         """Build an evalmap from MongoDB and write it as gzipped JSON.
@@ -508,8 +873,12 @@ class Dodgem():
         if self.verbose > 0:
             print(
                 f'3: {len(self.eval_map["3"])} 4: {len(self.eval_map["4"])} 5: {len(self.eval_map["5"])}')
+        # iterencode streams the ~1M-entry dict in chunks instead of
+        # materializing one giant JSON string before compression
+        encoder = json.JSONEncoder(separators=(",", ":"))
         with gzip.open(self.evalmap_path, 'wt') as f:
-            json.dump(self.eval_map, f, separators=(",", ":"))
+            for chunk in encoder.iterencode(self.eval_map):
+                f.write(chunk)
 
     def select_evalmap(self, n, min_depth, min_remain, max_side):
         """Select evalmap entries from MongoDB using filter thresholds.
@@ -542,8 +911,13 @@ class Dodgem():
             "value": {"$ne": 0},
             "$expr": {"$gte": [{"$subtract": ["$depth", "$remain"]}, diff]}
         }
-        projection = {"_id": 1, "value": 1, "depth": 1, "remain": 1}
-        result = self.collection.find(query, projection)
+        # Aggregation with a tight $project keeps remain (needed only by
+        # the $match above) out of the returned documents, and the large
+        # batch size cuts the number of getMore round trips for the n=5
+        # export
+        result = self.collection.aggregate(
+            [{"$match": query}, {"$project": {"value": 1, "depth": 1}}],
+            batchSize=10000, allowDiskUse=True)
         data_dict = {doc["_id"]: [doc["value"], doc["depth"]]
                      for doc in result}
         if n == 3:
@@ -626,20 +1000,24 @@ class Dodgem():
             key = self.make_key(p, turn)
         history.append(key)
         while True:
-            j = json.loads(key)
+            j = _loads(key)
             p = [j[0], j[1]]
             turn = j[2]
-            result = self.collection.find_one({"_id": key})
+            result = self.collection.find_one(
+                {"_id": key}, {"_id": 0, "value": 1})
             print(f'{['First', 'Second'][turn]} to move: {key} {self.show_mongo_eval(result, turn)}')
             self.show_position(p)
             pos = self.next_positions(p, turn)
+            keys2 = [self.make_key(child, 1 - turn) for child in pos]
+            docs = {doc["_id"]: doc for doc in self.collection.find(
+                {"_id": {"$in": keys2}}, {"value": 1})}
             num = 1
             for p in pos:
                 key2 = self.make_key(p, 1-turn)
-                result2 = self.collection.find_one({"_id": key2})
+                result2 = docs.get(key2)
                 move = self.last_move([key, key2])
                 print(
-                    f'({num}) {move} {key2} {self.show_mongo_eval(result2, 1-turn)} {self.show_evalmap(self.eval_map, key2)}')
+                    f'({num}) {move} {key2} {self.show_mongo_eval(result2, 1-turn)} {self.show_evalmap(self.eval_map, self.pack_key(p, 1-turn))}')
                 num += 1
             print('(0) Back')
             i = len(pos) + 1
@@ -651,7 +1029,43 @@ class Dodgem():
                 if i == 0:
                     return
             key2 = self.make_key(pos[i-1], 1-turn)
-            self.traverse(key2, copy.deepcopy(history))
+            self.traverse(key2, list(history))
+
+    def find_values(self, keys):
+        """Fetch evaluation values for many positions with a single query.
+
+        Args:
+            keys (list[str]): Canonical position keys (MongoDB ids).
+
+        Returns:
+            dict[str, int]: Mapping key -> value for the documents that
+                exist and carry an evaluation value.
+        """
+        docs = self.collection.find({"_id": {"$in": keys}}, {"value": 1})
+        return {doc["_id"]: doc["value"] for doc in docs if "value" in doc}
+
+    def load_documents(self, keys):
+        """Fetch full evaluation documents for many positions in chunks.
+
+        Used by the database-building loops, which previously issued one
+        find_one per position; a 300k-key bucket now costs 30 queries
+        instead of 300k round trips.
+
+        Args:
+            keys (list[str]): Canonical position keys (MongoDB ids).
+
+        Returns:
+            dict[str, dict]: Mapping key -> document for the documents
+                that exist.
+        """
+        docs = {}
+        for i in range(0, len(keys), 10000):
+            cursor = self.collection.find(
+                {"_id": {"$in": keys[i:i + 10000]}},
+                {"value": 1, "depth": 1, "remain": 1})
+            for doc in cursor:
+                docs[doc["_id"]] = doc
+        return docs
 
     def show_eval(self, pieces, turn):
         """Print the MongoDB evaluation of a given position if present.
@@ -664,7 +1078,8 @@ class Dodgem():
             None
         """
         key = self.make_key(pieces, turn)
-        result = self.collection.find_one({"_id": key})
+        result = self.collection.find_one(
+            {"_id": key}, {"_id": 0, "value": 1, "depth": 1})
         if result:
             print(
                 f'Eval: {pieces} {["First","Second"][turn]} eval = {result["value"]} depth = {result["depth"]}')
@@ -702,7 +1117,7 @@ class Dodgem():
 
         Args:
             evalmap (dict): The in-memory evalmap dictionary for self.n.
-            key (str): Canonical position key.
+            key (int): Packed position key (see pack_key).
 
         Returns:
             str: "evalmap: {value}" if present, otherwise an empty string.
@@ -745,7 +1160,7 @@ class Dodgem():
         # Check if the database has initial position
         self.start()
         key = self.make_key(self.pieces, self.turn)
-        if self.collection.find_one({"_id": key}) is None:
+        if self.collection.find_one({"_id": key}, {"_id": 1}) is None:
             if self.n not in self.warning_issued:
                 print(
                     f'Warning: Evaluation database for n={self.n} is not complete.')
@@ -782,6 +1197,8 @@ class Dodgem():
         Raises:
             SystemExit: If connection fails or ping fails.
         """
+        # Imported here so that games without MongoDB never load pymongo
+        from pymongo import MongoClient, errors
         try:
             self.client = MongoClient(
                 self.mongo_server, serverSelectionTimeoutMS=self.server_timeout_ms)
@@ -792,6 +1209,49 @@ class Dodgem():
                 f'For more information, see {self.document_url}database.html')
             sys.exit(1)
 
+    def queue_update(self, key, fields):
+        """Queue an upsert for the evaluation collection.
+
+        Queued operations are sent with flush_updates in batches of 1000,
+        replacing one acknowledged round trip per position in the
+        database-building loops.
+
+        Args:
+            key (str): Document _id (canonical position key).
+            fields (dict): Fields to $set on the document.
+
+        Returns:
+            None
+        """
+        from pymongo import UpdateOne
+        self._pending_ops.append(
+            UpdateOne({"_id": key}, {"$set": fields}, upsert=True))
+        if len(self._pending_ops) >= 1000:
+            self.flush_updates()
+
+    def flush_updates(self, acknowledged=False):
+        """Send all queued upserts as one unordered bulk write.
+
+        Args:
+            acknowledged (bool, optional): When True, waits for the
+                server to acknowledge the batch (w=1); used at barrier
+                points before dependent reads or roll-up writes. Batches
+                in between go out unacknowledged (w=0) for throughput.
+                Defaults to False.
+
+        Returns:
+            None
+        """
+        if not self._pending_ops:
+            return
+        from pymongo import WriteConcern
+        collection = self.collection
+        if not acknowledged:
+            collection = collection.with_options(
+                write_concern=WriteConcern(w=0))
+        collection.bulk_write(self._pending_ops, ordered=False)
+        self._pending_ops.clear()
+
     def create_database(self):
         """Create and fill the evaluation database by increasing remain/depth buckets.
 
@@ -819,7 +1279,8 @@ class Dodgem():
             print(f'n={self.n} computation start {self.evaluate_start}', flush=True)
         self.create_depth_database(self.init_pos(self.n), 0)
         for remain in range(1, self.max_remain + 1):
-            p = self.collection.find_one({"_id": f'r{remain}'})
+            p = self.collection.find_one(
+                {"_id": f'r{remain}'}, {"_id": 0, "positions": 1, "win": 1})
             if p and 'positions' in p and 'win' in p:
                 self.total_p = p['positions']
                 self.total_win = p['win']
@@ -828,47 +1289,53 @@ class Dodgem():
                 self.total_win = 0
                 self.total_p = 0
                 self.not_determined = set()
+                self._nd_decoded = {}
                 for depth in range(self.max_depth + 1):
                     self.evaluate_remain_depth(remain, depth)
+                # Iterative deepening: passes run at increasing depth and
+                # share the evaluate_simple caches, so a pass at depth d
+                # re-probes what depth d-1 proved from the cache and pays
+                # mostly for the new frontier. The depth ceiling scales
+                # down with bucket size as the fixed schedules used to.
                 if len(self.not_determined) < 5000:
-                    search_depth = (2, 2, 2, 3, 3, 3, 5, 5, 7, 9)
+                    max_search = 9
                 elif len(self.not_determined) < 10000:
-                    search_depth = (2, 2, 2, 3, 3, 3, 5, 5, 7)
+                    max_search = 7
                 elif len(self.not_determined) < 100000:
-                    search_depth = (2, 2, 2, 3, 3, 3, 5, 5)
-                elif len(self.not_determined) < 500000:
-                    search_depth = (2, 2, 3, 3, 3, 4, 4)
+                    max_search = 5
                 elif len(self.not_determined) < 700000:
-                    search_depth = (2, 2, 3, 3, 3, 4)
+                    max_search = 4
                 else:
-                    search_depth = (2, 2, 3)
-                for depth in search_depth:
+                    max_search = 3
+                for depth in range(2, max_search + 1):
+                    if not self.not_determined:
+                        break
                     if self.verbose > 1 and len(self.not_determined) > 0:
                         print(
-                            f'{datetime.now().strftime("%m-%d %H:%M:%S")} remain {remain} undetermined {len(self.not_determined)} re-search depth = {depth}           ', flush=True)
+                            f'{_timestamp()} remain {remain} undetermined {len(self.not_determined)} re-search depth = {depth}           ', flush=True)
+                    docs = self.load_documents(tuple(self.not_determined))
                     for p in tuple(self.not_determined):
-                        a, b, turn = json.loads(p)
-                        e = self.evaluate_simple([a, b], turn, depth, [])
+                        a, b, turn = self._nd_decoded[p]
+                        e = self.evaluate_simple([a, b], turn, depth, set())
                         if e != -1:
                             self.not_determined.remove(p)
-                            result = self.collection.find_one({"_id": p})
+                            del self._nd_decoded[p]
+                            result = docs[p]
                             remain = self.remain([a, b])
-                            self.collection.update_one(
-                                {"_id": p},
-                                {"$set": {"value": e,
-                                          "depth": result['depth'], "remain": remain}},
-                                upsert=True
-                            )
+                            self.queue_update(
+                                p, {"value": e,
+                                    "depth": result['depth'], "remain": remain})
                             if abs(e) >= self.eval_win:
                                 self.total_win += 1
+                    # Barrier: the next pass re-reads these documents
+                    self.flush_updates(acknowledged=True)
+                docs = self.load_documents(tuple(self.not_determined))
                 for p in self.not_determined:
-                    result = self.collection.find_one({"_id": p})
-                    self.collection.update_one(
-                        {"_id": p},
-                        {"$set": {"value": 0,
-                                  "depth": result['depth'], "remain": remain}},
-                        upsert=True
-                    )
+                    result = docs[p]
+                    self.queue_update(
+                        p, {"value": 0,
+                            "depth": result['depth'], "remain": remain})
+                self.flush_updates(acknowledged=True)
                 self.collection.update_one(
                     {"_id": f'r{remain}'},
                     {"$set": {"positions": self.total_p, "win": self.total_win}},
@@ -877,7 +1344,7 @@ class Dodgem():
                 forced_draw = f' forced draws {len(self.not_determined)}'
             if self.verbose > 1:
                 print(
-                    f'{datetime.now().strftime("%m-%d %H:%M:%S")} remain {remain} positions {self.total_p} forced win {self.total_win}{forced_draw}', flush=True)
+                    f'{_timestamp()} remain {remain} positions {self.total_p} forced win {self.total_win}{forced_draw}', flush=True)
         self.resolve_draw()
         end = datetime.now()
         if self.verbose > 0:
@@ -902,9 +1369,22 @@ class Dodgem():
         Returns:
             None
         """
-        for p in self.force_draw_positions():
-            self.rewrite_database(3, p, 0)
-    
+        if self.n != 3:
+            return
+        from pymongo import UpdateOne
+        keys = self.force_draw_positions()
+        docs = {doc['_id']: doc for doc in self.collection.find(
+            {"_id": {"$in": list(keys)}}, {"depth": 1, "remain": 1})}
+        ops = [
+            UpdateOne(
+                {"_id": key},
+                {"$set": {"value": 0, "depth": docs[key]['depth'],
+                          "remain": docs[key]['remain']}},
+                upsert=True)
+            for key in keys if key in docs]
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+
     def force_draw_positions(self):
         """Return canonical keys that should be treated as draws on 3x3.
 
@@ -915,9 +1395,9 @@ class Dodgem():
             None
 
         Returns:
-            list[str]: Canonical position keys to be recorded as draws.
+            tuple[str, ...]: Canonical position keys to be recorded as draws.
         """
-        return ['[[3,8],[4,6],1]', '[[2,3],[4,6],1]', '[[2,3],[4,8],1]']
+        return _FORCE_DRAW_3X3
 
     def rewrite_database(self, n, key, value):
         """Rewrite a specific position document in MongoDB with a new value.
@@ -934,7 +1414,8 @@ class Dodgem():
         """
         if self.n != n:
             return
-        result = self.collection.find_one({"_id": key})
+        result = self.collection.find_one(
+            {"_id": key}, {"_id": 0, "depth": 1, "remain": 1})
         self.collection.update_one(
             {"_id": key},
             {"$set": {"value": value,
@@ -959,6 +1440,9 @@ class Dodgem():
         """
         key = self.make_key(pieces, turn)
         self.open_mongodb()
+        # Large buckets are sharded into subdocuments tagged by their
+        # dr bucket id; index it so get_keys_dr avoids collection scans
+        self.collection_depth.create_index('dr')
         depth = self.max_depth
         remain = self.remain(self.pieces)
         self.collection_depth.update_one(
@@ -969,7 +1453,7 @@ class Dodgem():
         total = 0
         for depth in range(self.max_depth - 1, -1, -1):
             p = self.collection_depth.find_one(
-                {"_id": f'd{depth}r{self.max_remain}'})
+                {"_id": f'd{depth}r{self.max_remain}'}, {"_id": 1})
             if not p:
                 pos = set()  # Candidate positions = next to previous positions
                 prev_positions = self.get_keys(depth + 1)
@@ -981,8 +1465,9 @@ class Dodgem():
                 n = {}
                 for remain in range(1, self.max_remain + 1):
                     n[remain] = []
+                docs = self.load_documents(list(pos))
                 for p in pos:
-                    result = self.collection.find_one({"_id": p})
+                    result = docs.get(p)
                     if result:
                         if result['depth'] > depth:
                             if self.verbose > 3:
@@ -992,20 +1477,11 @@ class Dodgem():
                             if self.verbose > 3:
                                 print(
                                     f'Update {p} depth {depth} in database {result["depth"]}')
-                            if result['value']:
-                                self.collection.update_one(
-                                    {"_id": result['_id']},
-                                    {"$set": {
-                                        "value": result['value'], "depth": depth, "remain": result['remain']}},
-                                    upsert=True
-                                )
-                            else:
-                                self.collection.update_one(
-                                    {"_id": result['_id']},
-                                    {"$set": {
-                                        "depth": depth, "remain": result['remain']}},
-                                    upsert=True
-                                )
+                            # Re-setting value to its current value was a
+                            # no-op write; depth and remain are enough.
+                            self.queue_update(
+                                p, {"depth": depth,
+                                    "remain": result['remain']})
                             n[result['remain']].append(p)
                         else:
                             a, b, turn = json.loads(p)
@@ -1016,12 +1492,10 @@ class Dodgem():
                             print(f'{p} not found')
                         a, b, turn = json.loads(p)
                         remain = self.remain([a, b])
-                        self.collection.update_one(
-                            {"_id": p},
-                            {"$set": {"depth": depth, "remain": remain}},
-                            upsert=True
-                        )
+                        self.queue_update(p, {"depth": depth, "remain": remain})
                         n[remain].append(p)
+                # Barrier: the next depth iteration reads these documents
+                self.flush_updates(acknowledged=True)
                 batch_size = 300000
                 for remain in range(1, self.max_remain + 1):
                     if len(n[remain]) < batch_size:
@@ -1046,7 +1520,8 @@ class Dodgem():
                                           "key": sublist}},
                                 upsert=True
                             )
-            p = self.collection_depth.find_one(f'd{depth}')
+            p = self.collection_depth.find_one(
+                f'd{depth}', {"_id": 0, "positions": 1})
             if p and 'positions' in p:
                 sum = p['positions']
             else:
@@ -1064,25 +1539,26 @@ class Dodgem():
                 )
             if self.verbose > 1:
                 print(
-                    f'{datetime.now().strftime("%m-%d %H:%M:%S")} depth {depth} {sum} positions', flush=True)
+                    f'{_timestamp()} depth {depth} {sum} positions', flush=True)
             total += sum
         if self.verbose > 0:
             print(
-                f'{datetime.now().strftime("%m-%d %H:%M:%S")} n={self.n} Depth DB build complete positions {total}', flush=True)
+                f'{_timestamp()} n={self.n} Depth DB build complete positions {total}', flush=True)
 
     def get_keys(self, depth):
-        """Return all canonical keys at a given depth across every remain.
+        """Yield all canonical keys at a given depth across every remain.
+
+        Streams one remain bucket at a time so that a whole depth layer
+        (millions of keys on n=5) is never held in memory at once.
 
         Args:
             depth (int): Depth bucket.
 
         Returns:
-            list[str]: A list of canonical position keys at that depth.
+            Iterator[str]: Canonical position keys at that depth.
         """
-        keys = []
         for remain in range(1, self.max_remain + 1):
-            keys.extend(self.get_keys_dr(depth, remain))
-        return keys
+            yield from self.get_keys_dr(depth, remain)
 
     def get_keys_dr(self, depth, remain):
         """Return keys for a specific depth/remain bucket from MongoDB.
@@ -1098,16 +1574,13 @@ class Dodgem():
         """
         keys = []
         p = self.collection_depth.find_one(
-            {"_id": f'd{depth}r{remain}'})
+            {"_id": f'd{depth}r{remain}'}, {"_id": 0, "large": 1, "key": 1})
         if p:
             if 'large' in p:
                 query = {"dr": f'd{depth}r{remain}'}
-                projection = {"_id": 1}
-                cursor = self.collection_depth.find(query, projection)
-                for id in [doc["_id"] for doc in cursor]:
-                    p = self.collection_depth.find_one(
-                        {"_id": id})
-                    keys.extend(p['key'])
+                projection = {"_id": 0, "key": 1}
+                for doc in self.collection_depth.find(query, projection):
+                    keys.extend(doc['key'])
             else:
                 keys.extend(p['key'])
         return keys
@@ -1129,41 +1602,54 @@ class Dodgem():
             None
         """
         pos = self.get_keys_dr(depth, remain)
+        docs = self.load_documents(pos)
         win = 0
-        num = 0
+        todo = []
         for p in pos:
-            num += 1
-            if self.verbose > 2 and num % 1000 == 0:
-                print(
-                    f'remain {remain} depth {depth} computing {num} / {len(pos)}               \r', end='')
-            result = self.collection.find_one({"_id": p})
+            result = docs.get(p)
             if not result or 'value' not in result:
+                todo.append(p)
+            elif abs(result['value']) >= self.eval_win:
+                win += 1
+        results = None
+        if self.parallel and len(todo) >= 2000:
+            try:
+                results = self._evaluate_bucket_parallel(
+                    todo, same_remain_depth)
+            except Exception as e:
+                if self.verbose > 1:
+                    print(f'Parallel bucket failed ({e}); running serially')
+        if results is None:
+            results = []
+            todo_len = len(todo)
+            next_report = time.monotonic() + 2
+            for num, p in enumerate(todo, 1):
+                if self.verbose > 2 and time.monotonic() >= next_report:
+                    next_report = time.monotonic() + 2
+                    print(
+                        f'remain {remain} depth {depth} computing {num} / {todo_len}               \r', end='')
                 a, b, turn = json.loads(p)
                 e = self.evaluate_simple(
-                    [a, b], turn, same_remain_depth, [])
-                if e == -1:
-                    self.collection.update_one(
-                        {"_id": p},
-                        {"$set": {"depth": depth, "remain": remain}},
-                        upsert=True
-                    )
-                    self.not_determined.add(p)
-                else:
-                    remain = self.remain([a, b])
-                    self.collection.update_one(
-                        {"_id": p},
-                        {"$set": {"value": e, "depth": depth, "remain": remain}},
-                        upsert=True
-                    )
-                    if abs(e) >= self.eval_win:
-                        win += 1
-                    else:
-                        if self.verbose > 3:
-                            self.show_eval([a, b], turn)
-                            self.show_position([a, b])
+                    [a, b], turn, same_remain_depth, set())
+                results.append((p, e, self.remain([a, b])))
+        for p, e, r in results:
+            if e == -1:
+                self.queue_update(p, {"depth": depth, "remain": remain})
+                self.not_determined.add(p)
+                # Decoded once here so the re-search passes need no
+                # json.loads per key per depth.
+                self._nd_decoded[p] = _loads(p)
             else:
-                if abs(result['value']) >= self.eval_win:
+                self.queue_update(
+                    p, {"value": e, "depth": depth, "remain": r})
+                if abs(e) >= self.eval_win:
                     win += 1
+                elif self.verbose > 3:
+                    a, b, turn = json.loads(p)
+                    self.show_eval([a, b], turn)
+                    self.show_position([a, b])
+        # Barrier: the caller reads these documents back during re-search
+        self.flush_updates(acknowledged=True)
         if self.verbose > 2 and len(pos) > 0:
             print(
                 f'remain {remain} depth {depth} positions {len(pos)} forced win {win}      \r', end='')
@@ -1182,7 +1668,10 @@ class Dodgem():
             pieces (list[list[int]]): Position as [first_list, second_list].
             turn (int): Side to move (0 or 1).
             depth (int): Remaining depth to explore; negative means "undetermined".
-            history (list[str]): Path of visited keys for repetition detection.
+            history (set[str]): Keys on the current recursion path, used
+                for repetition detection. The key of this position is
+                added on entry and removed again before returning, so
+                the caller's set is left unchanged.
 
         Returns:
             int: One of:
@@ -1197,31 +1686,91 @@ class Dodgem():
             return 0
         if depth < 0:
             return -1  # Not determined
-        history.append(key_org)
-        if len(pieces[turn]) == 0:
-            return self.eval_win
-        if len(pieces[1 - turn]) == 0:
-            return -self.eval_win
-
-        pos = self.next_positions(pieces, turn)
-        if len(pos) == 0:
-            return self.eval_win + 1
-
-        min_eval = self.eval_win + 2
-        for p in pos:
-            key = self.make_key(p, 1 - turn)
-            result = self.collection.find_one({"_id": key})
-
-            if result and 'value' in result:
-                e = result["value"]
+        hit = self._tt.get(key_org)
+        if hit is not None and hit[1] >= depth:
+            self._tt.move_to_end(key_org)
+            return hit[0]
+        # The recursion shares one path set: add this position on entry
+        # and discard it on every return, instead of copying a history
+        # list per child
+        eval_win = self.eval_win
+        history.add(key_org)
+        try:
+            mg = self._mg
+            children = mg.get(key_org)
+            if children is None:
+                if not pieces[turn]:
+                    return eval_win
+                if not pieces[1 - turn]:
+                    return -eval_win
+
+                pos = self.next_with_remain(pieces, turn)
+                if not pos:
+                    return eval_win + 1
+                # Try the most advanced children first: positions nearer
+                # the end of the game are decided sooner, which feeds the
+                # winning-reply cutoff and the caches earlier. The remains
+                # come as move deltas, not per-child recomputations.
+                pos.sort(key=lambda item: item[1])
+                # The re-search schedule revisits the same positions at
+                # increasing depths, so the sorted child keys are cached;
+                # only non-terminal positions reach this point
+                children = [(self.make_key(p, 1 - turn), p) for p, _ in pos]
+                mg[key_org] = children
+                if len(mg) > 200000:
+                    mg.popitem(last=False)
             else:
-                e = self.evaluate_simple(
-                    p, 1 - turn, depth - 1, copy.deepcopy(history))
-            if e < min_eval:
-                min_eval = e
+                mg.move_to_end(key_org)
+
+            tt_get = self._tt.get
+            find_one = self.collection.find_one
+            min_eval = eval_win + 2
+            for key, p in children:
+                hit = tt_get(key)
+                if hit is not None and hit[1] >= depth - 1:
+                    e = hit[0]
+                else:
+                    result = find_one(
+                        {"_id": key}, {"_id": 0, "value": 1})
+                    if result and 'value' in result:
+                        e = result["value"]
+                        # Database values are final; any later probe depth
+                        # may be served from this entry
+                        self._tt_store(key, e, self.max_depth)
+                    else:
+                        e = self.evaluate_simple(
+                            p, 1 - turn, depth - 1, history)
+                if e < min_eval:
+                    min_eval = e
+                    if min_eval <= -eval_win:
+                        # A winning reply is found; no later sibling can
+                        # change the game-theoretic result
+                        break
+        finally:
+            history.discard(key_org)
         if min_eval == -1:
             return -1
-        return -min_eval
+        value = -min_eval
+        self._tt_store(key_org, value, depth)
+        return value
+
+    def _tt_store(self, key, value, depth):
+        """Record an evaluate_simple result, evicting the oldest entry when full.
+
+        Args:
+            key (str): Canonical position key.
+            value (int): Evaluation result (not -1).
+            depth (int): Depth at which the value was computed; probes at
+                this depth or shallower are served from the entry.
+
+        Returns:
+            None
+        """
+        tt = self._tt
+        tt[key] = (value, depth)
+        tt.move_to_end(key)
+        if len(tt) > 1000000:
+            tt.popitem(last=False)
 
     # Basic calculation functions
 
@@ -1237,16 +1786,77 @@ class Dodgem():
         Returns:
             int: The combined remain score (non-increasing along actual play).
         """
+        first_adv, second_adv, _ = self._leaf_tables()
         remain = 0
 
         for value in pieces[1]:
-            remain += 1 + value // self.n
+            remain += second_adv[value]
 
         for value in pieces[0]:
-            remain += self.n - (value % self.n)
+            remain += first_adv[value]
 
         return remain
 
+    def to_bits(self, pieces):
+        """Pack the two piece lists into a pair of bitsets.
+
+        Args:
+            pieces (list[list[int]]): Position as [first_list, second_list].
+
+        Returns:
+            tuple[int, int]: (first_bits, second_bits), bit i set when a
+                piece occupies square i.
+        """
+        bb0 = bb1 = 0
+        for i in pieces[0]:
+            bb0 |= 1 << i
+        for i in pieces[1]:
+            bb1 |= 1 << i
+        return bb0, bb1
+
+    def _move_tables(self):
+        """Return per-square move-target tables for both sides.
+
+        For each (turn, square) the table holds the candidate targets in
+        the order move_available historically produced them. -1 encodes
+        the exit and takes the slot of the forward direction, so exit
+        squares carry no forward target. Occupancy is not encoded; the
+        caller masks occupied targets out. Rebuilt lazily when the
+        board size changes.
+
+        Returns:
+            tuple: (table_first, table_second), each indexed by square
+                and holding a tuple of target squares (or -1).
+        """
+        if self._move_n != self.n:
+            n = self.n
+            t0 = []
+            t1 = []
+            for i in range(n * n):
+                moves = []
+                if i % n == n - 1:
+                    moves.append(-1)
+                else:
+                    moves.append(i + 1)
+                if i >= n:
+                    moves.append(i - n)
+                if i < n * (n - 1):
+                    moves.append(i + n)
+                t0.append(tuple(moves))
+                moves = []
+                if i < n:
+                    moves.append(-1)
+                else:
+                    moves.append(i - n)
+                if i % n > 0:
+                    moves.append(i - 1)
+                if i % n < n - 1:
+                    moves.append(i + 1)
+                t1.append(tuple(moves))
+            self._move_table = (tuple(t0), tuple(t1))
+            self._move_n = n
+        return self._move_table
+
     def next_positions(self, pieces, turn):
         """Generate all legal successor positions for the side to move.
 
@@ -1259,67 +1869,140 @@ class Dodgem():
 
         Returns:
             list[list[list[int]]]: A list of successor positions, each in
-                the same format [first_list, second_list].
+                the same format [first_list, second_list]. The list of
+                the side that moved is new; the opponent's list is
+                shared with the input, as no caller mutates candidates.
         """
         pos = []
-        for piece in pieces[turn]:
-            moves = self.move_available(pieces, piece, turn)
-            for m in moves:
+        bb0, bb1 = self.to_bits(pieces)
+        occ = bb0 | bb1
+        table = self._move_tables()[turn]
+        own = pieces[turn]
+        other = pieces[1 - turn]
+        for idx, piece in enumerate(own):
+            for m in table[piece]:
+                if m >= 0 and (occ >> m) & 1:
+                    continue
                 if m < 0:
-                    pos.append([
-                        [item for item in sub_array if item != piece]
-                        for sub_array in pieces
-                    ])
+                    moved = own[:idx] + own[idx + 1:]
                 else:
-                    pos.append([
-                        [m if item == piece else item for item in sub_array]
-                        for sub_array in pieces
-                    ])
+                    moved = own[:]
+                    moved[idx] = m
+                pos.append([moved, other] if turn == 0 else [other, moved])
         return pos
 
-    def move_available(self, pieces, i, turn):
-        """Return legal target squares for a given piece and side.
+    def next_with_remain(self, pieces, turn, base=None):
+        """Generate successor positions paired with their remain values.
 
-        For exits, the move is represented as -1. Otherwise, targets are
-        board indices that are empty.
+        A move changes the remain metric by the advancement-table delta
+        of the moved piece alone, so each child's remain is derived from
+        the parent's with one subtraction and one addition instead of a
+        full recomputation.
 
         Args:
-            pieces (list[list[int]]): Current position [first_list, second_list].
-            i (int): The current square index of the piece.
+            pieces (list[list[int]]): Current position as [first_list, second_list].
             turn (int): Side to move, 0 (First) or 1 (Second).
+            base (int, optional): remain(pieces) if the caller already
+                knows it. Defaults to None, computing it here.
 
         Returns:
-            list[int]: List of target squares (or -1 for exit).
+            list[tuple[list[list[int]], int]]: (successor, remain) pairs
+                in the same order as next_positions.
         """
-        place = []
-
-        if turn == 1:
-            if i < self.n:
-                place.append(-1)
-            elif self.is_empty(pieces, i - self.n):
-                place.append(i - self.n)
+        first_adv, second_adv, _ = self._leaf_tables()
+        adv = second_adv if turn else first_adv
+        if base is None:
+            base = self.remain(pieces)
+        pos = []
+        bb0, bb1 = self.to_bits(pieces)
+        occ = bb0 | bb1
+        table = self._move_tables()[turn]
+        own = pieces[turn]
+        other = pieces[1 - turn]
+        for idx, piece in enumerate(own):
+            gone = base - adv[piece]
+            for m in table[piece]:
+                if m >= 0 and (occ >> m) & 1:
+                    continue
+                if m < 0:
+                    moved = own[:idx] + own[idx + 1:]
+                    r = gone
+                else:
+                    moved = own[:]
+                    moved[idx] = m
+                    r = gone + adv[m]
+                pos.append(([moved, other] if turn == 0 else [other, moved], r))
+        return pos
 
-            if i % self.n > 0 and self.is_empty(pieces, i - 1):
-                place.append(i - 1)
+    def next_bits(self, bb0, bb1, turn):
+        """Generate all legal successor positions in bitset form.
 
-            if i % self.n < self.n - 1 and self.is_empty(pieces, i + 1):
-                place.append(i + 1)
+        The bitboard counterpart of next_positions for search code that
+        keeps positions as integer pairs and avoids per-child list
+        allocation.
 
-            return place
+        Args:
+            bb0 (int): Bitset of the First player's pieces.
+            bb1 (int): Bitset of the Second player's pieces.
+            turn (int): Side to move, 0 (First) or 1 (Second).
 
-        if i % self.n == self.n - 1:
-            place.append(-1)
-        elif self.is_empty(pieces, i + 1):
-            place.append(i + 1)
+        Returns:
+            list[tuple[int, int]]: Successor (first_bits, second_bits) pairs.
+        """
+        table = self._move_tables()[turn]
+        occ = bb0 | bb1
+        own = bb1 if turn else bb0
+        pos = []
+        bits = own
+        while bits:
+            lsb = bits & -bits
+            bits ^= lsb
+            for t in table[lsb.bit_length() - 1]:
+                if t < 0:
+                    moved = own ^ lsb
+                elif not (occ >> t) & 1:
+                    moved = own ^ lsb | (1 << t)
+                else:
+                    continue
+                pos.append((bb0, moved) if turn else (moved, bb1))
+        return pos
 
-        if i >= self.n and self.is_empty(pieces, i - self.n):
-            place.append(i - self.n)
+    def move_targets(self, occ, i, turn):
+        """Return legal target squares for a piece given an occupancy bitset.
 
-        if i < self.n * (self.n - 1) and self.is_empty(pieces, i + self.n):
-            place.append(i + self.n)
+        Args:
+            occ (int): Bitset of all occupied squares.
+            i (int): The current square index of the piece.
+            turn (int): Side to move, 0 (First) or 1 (Second).
 
+        Returns:
+            list[int]: List of target squares (or -1 for exit).
+        """
+        place = []
+        for t in self._move_tables()[turn][i]:
+            if t < 0:
+                place.append(-1)
+            elif not (occ >> t) & 1:
+                place.append(t)
         return place
 
+    def move_available(self, pieces, i, turn):
+        """Return legal target squares for a given piece and side.
+
+        For exits, the move is represented as -1. Otherwise, targets are
+        board indices that are empty.
+
+        Args:
+            pieces (list[list[int]]): Current position [first_list, second_list].
+            i (int): The current square index of the piece.
+            turn (int): Side to move, 0 (First) or 1 (Second).
+
+        Returns:
+            list[int]: List of target squares (or -1 for exit).
+        """
+        bb0, bb1 = self.to_bits(pieces)
+        return self.move_targets(bb0 | bb1, i, turn)
+
     def is_empty(self, pieces, i):
         """Check if a board square is empty.
 
@@ -1330,7 +2013,30 @@ class Dodgem():
         Returns:
             bool: True if no piece occupies index i, False otherwise.
         """
-        return i not in pieces[0] and i not in pieces[1]
+        bb0, bb1 = self.to_bits(pieces)
+        return not ((bb0 | bb1) >> i) & 1
+
+    def pack_key(self, pos, turn):
+        """Pack a position and side to move into a single integer key.
+
+        With n <= 5 the board has at most 25 squares, so each side fits
+        in 25 bits and the whole position in 51 bits. Integer keys hash
+        and compare much faster than the JSON strings from make_key,
+        which remain the MongoDB document ids.
+
+        Args:
+            pos (list[list[int]]): Position as [first_list, second_list].
+            turn (int): Side to move, 0 or 1.
+
+        Returns:
+            int: (first_bits << 26) | (second_bits << 1) | turn.
+        """
+        bits = turn
+        for i in pos[0]:
+            bits |= 1 << (26 + i)
+        for i in pos[1]:
+            bits |= 1 << (1 + i)
+        return bits
 
     def make_key(self, pos, turn):
         """Create a canonical JSON key for a position and side to move.
@@ -1344,7 +2050,11 @@ class Dodgem():
         Returns:
             str: Canonical JSON string "[[...],[...],turn]".
         """
-        return json.dumps([sorted(pos[0]), sorted(pos[1]), turn]).replace(' ', '')
+        # Built directly; byte-identical to compact json.dumps output,
+        # which existing database ids and evalmap keys were written with
+        first = ','.join(map(str, sorted(pos[0])))
+        second = ','.join(map(str, sorted(pos[1])))
+        return f'[[{first}],[{second}],{turn}]'
 
     def is_finished(self):
         """Check whether the game has finished and set the winner accordingly.
@@ -1362,21 +2072,47 @@ class Dodgem():
         Returns:
             bool: True if finished (win condition reached), False otherwise.
         """
-        if len(self.pieces[0]) == 0:
+        if not self.pieces[0]:
             self.win = 0
             return True
-        if len(self.pieces[1]) == 0:
+        if not self.pieces[1]:
             self.win = 1
             return True
 
         # When opponent cannot move, you lose
-        for piece in self.pieces[1 - self.turn]:
-            if len(self.move_available(self.pieces, piece, 1 - self.turn)) > 0:
-                return False
+        bb0, bb1 = self.to_bits(self.pieces)
+        if self.has_move(bb0, bb1, 1 - self.turn):
+            return False
 
         self.win = 1 - self.turn
         return True
 
+    def has_move(self, bb0, bb1, turn):
+        """Check whether a side has at least one legal move.
+
+        Stops at the first movable piece instead of materializing the
+        target lists that move_available builds, using the precomputed
+        move tables and a single occupancy bitset.
+
+        Args:
+            bb0 (int): Bitset of the First player's pieces.
+            bb1 (int): Bitset of the Second player's pieces.
+            turn (int): Side to test, 0 (First) or 1 (Second).
+
+        Returns:
+            bool: True if the side has a legal move (or exit), else False.
+        """
+        table = self._move_tables()[turn]
+        occ = bb0 | bb1
+        bits = bb1 if turn else bb0
+        while bits:
+            lsb = bits & -bits
+            bits ^= lsb
+            for t in table[lsb.bit_length() - 1]:
+                if t < 0 or not (occ >> t) & 1:
+                    return True
+        return False
+
     def min_remain(self, pos):
         """Filter positions to those with the minimal remain() value.
 
@@ -1386,9 +2122,16 @@ class Dodgem():
         Returns:
             list[list[list[int]]]: Subset of positions with minimal remain score.
         """
-        remain_values = [self.remain(item) for item in pos]
-        min_value = min(remain_values)
-        return [item for item, value in zip(pos, remain_values) if value == min_value]
+        best = []
+        min_value = self.n * self.n * 2
+        for item in pos:
+            value = self.remain(item)
+            if value < min_value:
+                min_value = value
+                best = [item]
+            elif value == min_value:
+                best.append(item)
+        return best
 
     def show_position(self, pos):
         """Render the board to stdout using box characters.
@@ -1418,6 +2161,23 @@ class Dodgem():
             print()
             print(hor)
 
+    def record_move(self, pieces, turn):
+        """Append a committed position to the move history.
+
+        Maintains both the display-oriented list of canonical string
+        keys (used by last_move and show_move) and the packed-key
+        counter used for O(1) repetition checks in play_comp.
+
+        Args:
+            pieces (list[list[int]]): Position as [first_list, second_list].
+            turn (int): Side that just moved, 0 or 1.
+
+        Returns:
+            None
+        """
+        self.move_history.append(self.make_key(pieces, turn))
+        self.history_count[self.pack_key(pieces, turn)] += 1
+
     def start(self):
         """Reset the engine to the initial position and set the first player to move.
 
@@ -1432,6 +2192,7 @@ class Dodgem():
         self.pieces = self.init_pos(self.n)
         self.turn = 0
         self.move_history = [self.make_key(self.pieces, self.turn)]
+        self.history_count = Counter((self.pack_key(self.pieces, self.turn),))
 
     def init_pos(self, n):
         """Return the initial piece lists for a given board size.
@@ -1464,3 +2225,90 @@ class Dodgem():
             int: Maximum depth for that board size.
         """
         return MAX_DEPTH[n-3]
+
+
+# Parallel root search workers. Module-level so ProcessPoolExecutor can
+# pickle references to them; each worker process holds one engine built
+# by _search_init and reuses it (and its transposition table) for every
+# candidate it is handed.
+
+_worker = None
+
+
+def _search_init(n, evalmap_path, use_evalmap):
+    """Build the per-worker engine for the parallel root search.
+
+    Args:
+        n (int): Board size.
+        evalmap_path (str): Path to the evalmap file.
+        use_evalmap (bool): Whether the current level searches with the
+            evalmap; when False the worker starts from an empty table.
+
+    Returns:
+        None
+    """
+    global _worker
+    _worker = Dodgem(n, evalmap=evalmap_path)
+    # Workers never call set_level, which is where use_mongo is normally
+    # assigned; the parallel path is only taken for non-mongo levels
+    _worker.use_mongo = False
+    if not use_evalmap:
+        _worker.eval_map = {}
+
+
+def _search_root(job):
+    """Evaluate one root candidate in a worker process.
+
+    Args:
+        job (tuple): (pieces, turn, depth) for Dodgem.evaluate.
+
+    Returns:
+        int: The evaluation of the candidate.
+    """
+    pieces, turn, depth = job
+    return _worker.evaluate(pieces, turn, depth)
+
+
+# Database-build workers for the parallel bucket evaluation. Each worker
+# holds one engine with its own MongoDB client, built by _bucket_init.
+
+_db_worker = None
+
+
+def _bucket_init(n, evalmap_path, mongo_server):
+    """Build the per-worker engine for parallel bucket evaluation.
+
+    Args:
+        n (int): Board size.
+        evalmap_path (str): Path to the evalmap file.
+        mongo_server (str): MongoDB server URI.
+
+    Returns:
+        None
+    """
+    global _db_worker
+    _db_worker = Dodgem(n, evalmap=evalmap_path)
+    _db_worker.mongo_server = mongo_server
+    _db_worker.verbose = 0
+    _db_worker.connect_mongodb()
+    _db_worker.db = _db_worker.client[_db_worker.db_name]
+    _db_worker.collection = _db_worker.db[f"eval_{n}"]
+
+
+def _bucket_eval(job):
+    """Evaluate one shard of bucket keys in a worker process.
+
+    Args:
+        job (tuple): (keys, depth) — canonical position keys and the
+            depth for evaluate_simple.
+
+    Returns:
+        list[tuple[str, int, int]]: (key, evaluation, remain) per key.
+    """
+    keys, depth = job
+    out = []
+    for p in keys:
+        a, b, turn = _loads(p)
+        e = _db_worker.evaluate_simple([a, b], turn, depth, set())
+        out.append((p, e, _db_worker.remain([a, b])))
+    return out
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk
 from .dodgem import Dodgem
@@ -25,6 +26,28 @@ class DodgemGUI:
         self.selected_piece = None
         self.canvas_margin = 15
         self.after_id = None
+        # Persistent canvas items: (turn, idx) -> polygon id, plus the
+        # outline state they were last drawn with
+        self.piece_items = {}
+        self.drawn_outline = (None, True)
+        self._points_key = None  # geometry of the cached piece points
+        self._drawn_grid = None  # geometry of the grid items on canvas
+        self._status_text = None  # text currently shown in the status label
+        self._redraw_pending = False
+        # Single worker for the AI search, so the Tk event loop keeps
+        # handling clicks and repaints while the computer is thinking.
+        # The generation counter orphans poll callbacks of searches that
+        # a restart has superseded.
+        self._ai_executor = ThreadPoolExecutor(max_workers=1)
+        self._ai_future = None
+        self._ai_generation = 0
+        # Delay before scheduling the next AI move; the Start button keeps
+        # its own 500 ms pause so the initial board is visible
+        self.ai_delay_ms = 1
+        # Warm the engine's evalmap cache while the window is built, so
+        # the first Start does not block on reading the file
+        self._evalmap_future = self._ai_executor.submit(
+            self.game.load_evalmap)
         self.create_widgets()
 
     def create_widgets(self):
@@ -47,9 +70,10 @@ class DodgemGUI:
         self.players = {'Human': 0}
         for level in range(1, 5):
             self.players[f'CPU L{level}'] = level
+        level_label = {v: k for k, v in self.players.items()}
 
         def label(i):
-            return next((k for k, v in self.players.items() if v == self.game.level[i]), None)
+            return level_label.get(self.game.level[i])
 
         ttk.Label(self.settings_frame, text="First:").grid(
             row=1, column=0)
@@ -59,6 +83,7 @@ class DodgemGUI:
             values=list(self.players.keys()), width=10,
         )
         first_menu.grid(row=1, column=1)
+        first_menu.bind("<<ComboboxSelected>>", self.player_menu_change)
 
         ttk.Label(self.settings_frame, text="Second: ").grid(
             row=1, column=2)
@@ -68,6 +93,8 @@ class DodgemGUI:
             values=list(self.players.keys()), width=10, state='readonly'
         )
         second_menu.grid(row=1, column=3)
+        second_menu.bind("<<ComboboxSelected>>", self.player_menu_change)
+        self._player_levels = list(self.game.level)
 
         # Start button
         self.start_button = tk.Button(
@@ -83,28 +110,46 @@ class DodgemGUI:
         self.master.update_idletasks()
         self.canvas_size = self.master.winfo_width() - self.canvas_margin
         self.canvas = tk.Canvas(
-            self.master, width=self.canvas_size, height=self.canvas_size, bg="white")
+            self.master, width=self.canvas_size, height=self.canvas_size,
+            bg="white", highlightthickness=0, borderwidth=0)
         self.canvas.pack()
-        self.master.update_idletasks()
+        # No forced layout pass here: the items drawn by init_board and
+        # the pack geometry settle together in one idle-time paint
         self.init_board()
         self.canvas.bind("<Button-1>", self.on_click)
+        self.master.bind("<Configure>", self.on_resize)
 
     def size_menu_change(self, event):
         if self.game.finished or self.initial:
             self.init_board()
 
+    def player_menu_change(self, event):
+        # Cache the selected levels so init_board reads a plain list
+        # instead of crossing the Tcl bridge with StringVar.get()
+        self._player_levels = [
+            self.players[self.first_player_var.get()],
+            self.players[self.second_player_var.get()]]
+
     def init_board(self):
         self.game.n = self.size_var.get()
-        self.game.level = [
-            self.players[self.first_player_var.get()], self.players[self.second_player_var.get()]]
+        self.game.level = list(self._player_levels)
         self.cell_size = self.canvas_size // self.game.n
         self.game.start()
-        self.update_board()
+        self.redraw_all()
 
     def start_game(self):
         if self.after_id:
             self.master.after_cancel(self.after_id)
             self.after_id = None
+        self._ai_generation += 1
+        future = self._ai_future
+        if future is not None and not future.done():
+            # The worker thread is still mutating the game state; defer
+            # the restart until it finishes instead of resetting the
+            # game underneath it. Its result is discarded either way.
+            self.after_id = self.master.after(30, self.start_game)
+            return
+        self._ai_future = None
 
         # Initialize board
         self.init_board()
@@ -116,64 +161,190 @@ class DodgemGUI:
             self.game.open_mongodb()
         if self.game.level[0] != self.game.level[1]:
             self.game.refresh_evalmap = True
+        if self._evalmap_future is not None:
+            # Usually already done; the load ran during window setup
+            self._evalmap_future.result()
+            self._evalmap_future = None
+        # Served from the engine's parsed-file cache when the preload
+        # covered this board size; reads the file only if n changed
         self.game.load_evalmap()
 
         self.selected_piece = None
         self.initial = False
-        self.update_board()
+        self.request_redraw()
         self.update_status()
         self.game.show_move()
         if self.game.level[self.game.turn] > 0:
             self.after_id = self.master.after(500, self.do_step)
-            self.after_id = None
 
-    def update_board(self):
-        canvas_size = self.master.winfo_width() - self.canvas_margin
-        if self.canvas_size != canvas_size:
-            self.canvas_size = canvas_size
-            self.canvas.configure(width=canvas_size, height=canvas_size)
-        self.canvas.delete("all")
+    def rebuild_point_cache(self):
+        # Triangle coordinates are pure functions of (square, board
+        # size, cell size); compute them once per geometry instead of
+        # per piece per redraw. ▶ for the first player, ▲ for the second
         size = self.game.n
-        self.cell_size = self.canvas_size // self.game.n
+        cell = self.cell_size
+        margin = cell // 6
+        span = cell - margin * 2
+        blue = []
+        red = []
+        for idx in range(size * size):
+            row, col = divmod(idx, size)
+            x0 = col*cell+margin
+            y0 = row*cell+margin
+            x1 = x0+span
+            y1 = y0+span
+            blue.append([
+                x0, y0,             # top-left
+                x0, y1,             # bottom-left
+                x1, (y0 + y1) / 2   # middle-right
+            ])
+            red.append([
+                (x0 + x1) / 2, y0,  # middle-top
+                x0, y1,             # bottom-left
+                x1, y1              # bottom-right
+            ])
+        self._points = (blue, red)
+        self._points_key = (size, self.cell_size)
+
+    def piece_points(self, turn, idx):
+        if self._points_key != (self.game.n, self.cell_size):
+            self.rebuild_point_cache()
+        return self._points[turn][idx]
 
-        # Draw grid
-        for r in range(size):
-            for c in range(size):
-                x0, y0 = c*self.cell_size, r*self.cell_size
-                x1, y1 = x0+self.cell_size, y0+self.cell_size
-                self.canvas.create_rectangle(x0, y0, x1, y1)
+    def piece_outline(self, idx):
+        if self.selected_piece == idx:
+            return "yellow"
+        return "white" if self.game.finished else "black"
+
+    def redraw_all(self):
+        # Full rebuild; used for board init and canvas resizes. Per-move
+        # changes go through the incremental path in update_board.
+        canvas = self.canvas
+        size = self.game.n
+        self.cell_size = cell = self.canvas_size // size
+
+        if (size, cell) == self._drawn_grid:
+            # Same geometry (e.g. restarting a game): the grid items
+            # are still valid, only the pieces need rebuilding
+            for item_id in self.piece_items.values():
+                canvas.delete(item_id)
+        else:
+            # Draw grid: the border plus 2(n-1) lines, instead of one
+            # rectangle item per cell
+            canvas.delete("all")
+            board = size * cell
+            canvas.create_rectangle(0, 0, board, board)
+            for i in range(1, size):
+                x = i * cell
+                canvas.create_line(x, 0, x, board)
+                canvas.create_line(0, x, board, x)
+            self._drawn_grid = (size, cell)
 
         # Draw pieces
+        self.piece_items = {}
         for turn, pieces in enumerate(self.game.pieces):
-            margin = self.cell_size // 6
             color = "blue" if turn == 0 else "red"
             for idx in pieces:
-                row, col = idx // size, idx % size
-                x0 = col*self.cell_size+margin
-                y0 = row*self.cell_size+margin
-                x1 = x0+self.cell_size-margin*2
-                y1 = y0+self.cell_size-margin*2
-                if self.selected_piece == idx:
-                    outline = "yellow"
-                else:
-                    outline = "white" if self.game.finished else "black"
-                if turn == 0:
-                    # ▶ (right-pointing triangle)
-                    points = [
-                        x0, y0,             # top-left
-                        x0, y1,             # bottom-left
-                        x1, (y0 + y1) / 2   # middle-right
-                    ]
-                else:
-                    # ▲ (up-pointing triangle)
-                    points = [
-                        (x0 + x1) / 2, y0,  # middle-top
-                        x0, y1,             # bottom-left
-                        x1, y1              # bottom-right
-                    ]
-                self.canvas.create_polygon(
-                    points, fill=color, outline=outline, width=2
+                self.piece_items[(turn, idx)] = canvas.create_polygon(
+                    self.piece_points(turn, idx), fill=color,
+                    outline=self.piece_outline(idx), width=2
                 )
+        self.drawn_outline = (self.selected_piece, self.game.finished)
+        self.piece_sets = [set(self.game.pieces[0]),
+                           set(self.game.pieces[1])]
+        self.update_status()
+
+    def move_piece(self, turn, src, dst):
+        # The engine's lists stay authoritative; the set mirror keeps
+        # the click hit tests O(1)
+        self.game.pieces[turn].remove(src)
+        self.piece_sets[turn].discard(src)
+        if dst is not None:
+            self.game.pieces[turn].append(dst)
+            self.piece_sets[turn].add(dst)
+
+    def set_selection(self, new_idx):
+        # Selection only changes two outlines; reconfigure those items
+        # instead of requesting a board repaint
+        old = self.selected_piece
+        if old == new_idx:
+            return
+        self.selected_piece = new_idx
+        turn = self.game.turn
+        item = self.piece_items.get((turn, old))
+        if item is not None:
+            self.canvas.itemconfigure(item, outline=self.piece_outline(old))
+        item = self.piece_items.get((turn, new_idx))
+        if item is not None:
+            self.canvas.itemconfigure(item, outline="yellow")
+        self.drawn_outline = (new_idx, self.game.finished)
+
+    def request_redraw(self):
+        # Mutations request a repaint instead of painting directly, so
+        # several dirty events inside one handler collapse into a
+        # single update_board call at idle time
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        self.master.after_idle(self.flush_redraw)
+
+    def flush_redraw(self):
+        self._redraw_pending = False
+        self.update_board()
+
+    def on_resize(self, event):
+        # Configure events of child widgets also reach the toplevel
+        # binding; only window resizes matter here
+        if event.widget is not self.master:
+            return
+        canvas_size = event.width - self.canvas_margin
+        if canvas_size <= 0 or canvas_size == self.canvas_size:
+            return
+        scale = canvas_size / self.canvas_size
+        self.canvas.configure(width=canvas_size, height=canvas_size)
+        # Tk transforms all item coordinates in C; no Python-level
+        # rebuild of the grid and pieces
+        self.canvas.scale("all", 0, 0, scale, scale)
+        self.canvas_size = canvas_size
+        self.cell_size = canvas_size // self.game.n
+        # The scaled items now reflect the new cell size
+        self._drawn_grid = (self.game.n, self.cell_size)
+
+    def update_board(self):
+        # Only one piece moves or leaves per turn, so diff the drawn
+        # polygons against the position instead of repainting the board
+        self.piece_sets = [set(self.game.pieces[0]),
+                           set(self.game.pieces[1])]
+        current = {(turn, idx)
+                   for turn, pieces in enumerate(self.piece_sets)
+                   for idx in pieces}
+        removed = [item for item in self.piece_items if item not in current]
+        added = [item for item in current if item not in self.piece_items]
+        for old in removed:
+            # A move vacates one square and fills another for the same
+            # player; slide the existing polygon there with a single
+            # coords call instead of deleting and recreating it
+            new = next((item for item in added if item[0] == old[0]), None)
+            if new is None:
+                self.canvas.delete(self.piece_items.pop(old))
+            else:
+                added.remove(new)
+                item_id = self.piece_items.pop(old)
+                self.canvas.coords(
+                    item_id, *self.piece_points(new[0], new[1]))
+                self.piece_items[new] = item_id
+        for turn, idx in added:
+            self.piece_items[(turn, idx)] = self.canvas.create_polygon(
+                self.piece_points(turn, idx),
+                fill="blue" if turn == 0 else "red",
+                outline=self.piece_outline(idx), width=2
+            )
+        outline_state = (self.selected_piece, self.game.finished)
+        if outline_state != self.drawn_outline:
+            for (turn, idx), item_id in self.piece_items.items():
+                self.canvas.itemconfigure(
+                    item_id, outline=self.piece_outline(idx))
+            self.drawn_outline = outline_state
 
         # Update status
         self.update_status()
@@ -202,8 +373,9 @@ class DodgemGUI:
             else:
                 text = f"{color} (computer) is thinking"
 
-        self.status_label.config(text=text)
-        self.master.update_idletasks()
+        if text != self._status_text:
+            self._status_text = text
+            self.status_label.config(text=text)
 
     def on_click(self, event):
         size = self.game.n
@@ -216,39 +388,36 @@ class DodgemGUI:
 
         if self.selected_piece is None:
             # If piece is not selected
-            if clicked_pos in self.game.pieces[turn]:
-                self.selected_piece = clicked_pos
-                self.update_board()
+            if clicked_pos in self.piece_sets[turn]:
+                self.set_selection(clicked_pos)
             return
         else:
             avail = self.game.move_available(
                 self.game.pieces, self.selected_piece, turn)
             if clicked_pos == self.selected_piece and -1 in avail:
                 # Remove a piece
-                self.game.pieces[turn].remove(self.selected_piece)
+                self.move_piece(turn, self.selected_piece, None)
             elif clicked_pos in avail:
                 # Normal move
-                self.game.pieces[turn].remove(self.selected_piece)
-                self.game.pieces[turn].append(clicked_pos)
-            elif clicked_pos in self.game.pieces[turn]:
+                self.move_piece(turn, self.selected_piece, clicked_pos)
+            elif clicked_pos in self.piece_sets[turn]:
                 # Reselect a piece
-                self.selected_piece = clicked_pos
-                self.update_board()
+                self.set_selection(clicked_pos)
                 return
             else:
                 return
 
         # There was a move
         self.selected_piece = None
-        key = self.game.make_key(self.game.pieces, turn)
-        self.game.move_history.append(key)
-        repetition = self.game.move_history.count(key)
+        self.game.record_move(self.game.pieces, turn)
+        repetition = self.game.history_count[
+            self.game.pack_key(self.game.pieces, turn)]
         if self.game.is_finished():
             self.game.finished = True
         if repetition >= self.game.draw_repetition:
             self.game.finished = True
             self.game.draw = True
-        self.update_board()
+        self.request_redraw()
         if self.game.finished:
             self.game.show_result()
             return
@@ -256,24 +425,38 @@ class DodgemGUI:
         self.game.show_move()
         if self.game.level[self.game.turn] > 0:
             self.update_status()
-            self.after_id = self.master.after(20, self.do_step)
-            self.after_id = None
+            self.after_id = self.master.after(self.ai_delay_ms, self.do_step)
 
     def do_step(self):
         if self.game.finished:
             return
 
-        turn = self.game.turn
-        if self.game.level[turn] > 0:
-            self.game.set_level()
-            self.game.play_comp()
-            self.update_board()
-            if self.game.finished:
-                self.game.show_result()
-                return
-            self.game.show_move()
-            self.game.turn = 1-turn
-            if self.game.level[self.game.turn] > 0:
-                self.update_status()
-                self.after_id = self.master.after(200, self.do_step)
-                self.after_id = None
+        if self.game.level[self.game.turn] > 0:
+            self._ai_future = self._ai_executor.submit(self.run_ai_move)
+            self.poll_ai(self._ai_future, self._ai_generation)
+
+    def run_ai_move(self):
+        # Runs on the worker thread: engine calls only, no Tk access
+        self.game.set_level()
+        self.game.play_comp()
+
+    def poll_ai(self, future, generation):
+        if generation != self._ai_generation:
+            # A restart superseded this search; start_game waits for the
+            # worker and discards its result
+            return
+        if not future.done():
+            self.after_id = self.master.after(
+                30, lambda: self.poll_ai(future, generation))
+            return
+        self._ai_future = None
+        future.result()  # surface exceptions from the worker
+        # play_comp has already passed the turn to the other side
+        self.request_redraw()
+        if self.game.finished:
+            self.game.show_result()
+            return
+        self.game.show_move()
+        if self.game.level[self.game.turn] > 0:
+            self.update_status()
+            self.after_id = self.master.after(self.ai_delay_ms, self.do_step)